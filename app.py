@@ -2,160 +2,852 @@
 JSON Dump - A simple web application that receives JSON payloads and writes them to files.
 """
 
+import errno
+import itertools
 import json
 import os
-import uuid
-from datetime import datetime
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from flask import Flask, request, jsonify
+import orjson
+import simdjson
+from flask import Flask, Response, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import Request
 
 app = Flask(__name__)
 
 # Configuration from environment variables with sensible defaults
 DATA_DIR = Path(os.environ.get("JSON_DUMP_DIR", "./data"))
+# Absolute DATA_DIR as bytes with a trailing separator. File paths are built by concatenating
+# bytes filenames onto it and passed to os.open as-is, with no Path objects or decoding.
+_DATA_PREFIX = os.fsencode(os.path.join(DATA_DIR.resolve(), ""))
 MAX_CONTENT_LENGTH = int(os.environ.get("JSON_DUMP_MAX_SIZE", 1024 * 1024))  # 1MB default
 
+# Batch log mode: append JSON payloads to a per-worker NDJSON log instead of one file each
+BATCH_LOG = os.environ.get("JSON_DUMP_BATCH_LOG", "").lower() in ("1", "true", "yes")
+LOG_ROLL_SIZE = int(os.environ.get("JSON_DUMP_LOG_ROLL_SIZE", 64 * 1024 * 1024))  # 64MB default
+LOG_FSYNC_INTERVAL = float(os.environ.get("JSON_DUMP_LOG_FSYNC_INTERVAL", 1.0))  # seconds
+
+# Staging mode: write files to a fast (usually tmpfs) directory and move them to DATA_DIR
+# in batches. Disabled unless JSON_DUMP_STAGING_DIR is set.
+STAGING_DIR = os.environ.get("JSON_DUMP_STAGING_DIR") or None
+STAGING_INTERVAL = float(os.environ.get("JSON_DUMP_STAGING_INTERVAL", 5.0))  # seconds
+STAGING_MAX_BYTES = int(os.environ.get("JSON_DUMP_STAGING_MAX_BYTES", 64 * 1024 * 1024))  # per worker
+_STAGING_PREFIX = os.fsencode(os.path.join(Path(STAGING_DIR).resolve(), "")) if STAGING_DIR else None
+
 # Set Flask's max content length
 app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 
+# Files are created with mode 640 and directories with 750 without any chmod calls
+os.umask(0o027)
+
+# Background file writes: threads per worker process, and how many writes may be queued
+# before requests have to wait for the backlog to drain
+WRITER_THREADS = 4
+MAX_PENDING_WRITES = 64
+
+# Bodies are read in chunks of this size when they are streamed straight to disk
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Matches the start of anything that could be a JSON document (optional BOM and whitespace,
+# then the first character of a JSON value). Whitespace-only prefixes are inconclusive.
+_JSON_START = re.compile(rb'(?:\xef\xbb\xbf)?[ \t\r\n]*(?:[{\["\-0-9tfn]|\Z)')
+
+# Response bodies that never change, serialized once at import
+_EMPTY_PAYLOAD = orjson.dumps({"error": "Empty payload"})
+_STAGING_FULL = orjson.dumps({"error": "Server busy, try again later"})
+_PAYLOAD_TOO_LARGE = orjson.dumps({
+    "error": f"Payload too large. Maximum size is {MAX_CONTENT_LENGTH} bytes"
+})
+_INTERNAL_ERROR = orjson.dumps({"error": "Internal server error"})
+_HEALTHY = orjson.dumps({"status": "healthy"})
+_HEALTHY_HEADERS = [
+    ("Content-Type", "application/json"),
+    ("Content-Length", str(len(_HEALTHY))),
+]
+
+# Success response body, filled in with %-formatting. content_type must already be
+# JSON-encoded; filename (bytes) and method are plain ASCII and need no escaping.
+_SUCCESS_TEMPLATE = (
+    b'{"success":true,"filename":"%b","size":%d,"content_type":%b,'
+    b'"method":"%b","parsed_as_json":%b,"was_form_data":%b}'
+)
+_JSON_BOOL = (b"false", b"true")
+
+# Filename timestamp cache as (epoch second, formatted timestamp bytes)
+_timestamp = (0, b"")
+
+# This process's pid in hex and its filename counter; both are reset in forked children
+_pid_hex = b"%x" % os.getpid()
+_counter = itertools.count()
+
+# Per-thread simdjson parsers, so each parser's internal buffers are reused across requests
+_local = threading.local()
+
+# fdatasync skips flushing metadata that isn't needed to read the data back (not on macOS)
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+# The current process's batch log (see get_batch_log)
+_batch_log = None
+_batch_log_lock = threading.Lock()
+
+# The current process's background writer (see get_writer)
+_writer = None
+_writer_lock = threading.Lock()
+
+# The current process's stager (see get_stager)
+_stager = None
+_stager_lock = threading.Lock()
+
 
 def ensure_data_dir():
-    """Create the data directory if it doesn't exist."""
+    """Create the data directory, and the staging directory if enabled, if they don't exist."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if STAGING_DIR:
+        os.makedirs(STAGING_DIR, exist_ok=True)
 
 
-def generate_filename(extension="json"):
-    """Generate a unique filename with timestamp and UUID."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = uuid.uuid4().hex[:8]
-    return f"{timestamp}_{unique_id}.{extension}"
+def generate_filename(extension=b"json"):
+    """
+    Generate a unique filename (as bytes) with timestamp, process ID and counter.
 
+    The formatted timestamp is cached and only rebuilt when the second changes.
+    The pid plus a per-process counter keeps names from different workers apart
+    without reading any randomness.
+    """
+    global _timestamp
+    now = int(time.time())
+    second, timestamp = _timestamp
+    if now != second:
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(now)).encode()
+        _timestamp = (now, timestamp)
+    return b"%b_%b%08x.%b" % (timestamp, _pid_hex, next(_counter), extension)
 
-@app.route("/dump", methods=["GET", "POST", "PUT", "PATCH", "DELETE"])
-def dump_json():
+
+def _reset_after_fork():
+    """Give a forked child (a gunicorn worker) its own filename state and background resources."""
+    global _pid_hex, _counter
+    global _batch_log, _batch_log_lock, _writer, _writer_lock, _stager, _stager_lock
+    _pid_hex = b"%x" % os.getpid()
+    _counter = itertools.count()
+    _batch_log, _batch_log_lock = None, threading.Lock()
+    _writer, _writer_lock = None, threading.Lock()
+    _stager, _stager_lock = None, threading.Lock()
+
+
+# Fork-based servers (gunicorn with preload_app) import the app once in the master
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_json_parser():
+    """Return this thread's simdjson parser, creating it on first use."""
+    parser = getattr(_local, "json_parser", None)
+    if parser is None:
+        parser = _local.json_parser = simdjson.Parser()
+    return parser
+
+
+def write_all(fd, data):
+    """Write all of `data` to `fd`, normally in a single write() call."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def write_line(fd, data):
+    """Write `data` and a trailing newline to `fd`, gathered into one writev() call if possible."""
+    if not hasattr(os, "writev"):
+        write_all(fd, data + b"\n")
+        return
+    written = os.writev(fd, (data, b"\n"))
+    if written <= len(data):
+        # Short write: finish the record with plain writes
+        write_all(fd, memoryview(data)[written:])
+        write_all(fd, b"\n")
+
+
+def open_private(path, flags):
+    """Opener for open() that creates files with mode 640."""
+    return os.open(path, flags, 0o640)
+
+
+def write_file(filepath, payload, sync=False):
     """
-    Receive a payload and write it to a file.
+    Write `payload` to a new file with unbuffered writes straight on the fd.
+
+    With `sync`, the data is flushed to disk before returning.
+    """
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC, 0o640)
+    try:
+        write_all(fd, payload)
+        if sync:
+            _datasync(fd)
+    finally:
+        os.close(fd)
 
-    Accepts any content type and HTTP method. JSON payloads are pretty-printed,
-    form data is converted to JSON, other content types are saved as raw data.
 
-    Returns the filename of the created file.
+def move_file(src, dst):
     """
-    # Ensure data directory exists
-    ensure_data_dir()
+    Move a file, copying it if `src` and `dst` are on different filesystems.
+
+    A copied file is written under a temporary name first, so `dst` only ever
+    appears complete.
+    """
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        partial = dst + b".part"
+        shutil.copyfile(src, partial)
+        os.rename(partial, dst)
+        os.unlink(src)
+
+
+def read_body(req, head=b""):
+    """
+    Read the request body, after an already-consumed `head`, into a single buffer.
+
+    With a known Content-Length the body is read straight into one preallocated
+    bytearray, so it's only held in memory once. Returns a bytes-like object.
+    """
+    # Accessing the stream first enforces MAX_CONTENT_LENGTH before anything is allocated
+    stream = req.stream
+    length = req.content_length
+    if length is None:
+        return head + stream.read()
+    view = memoryview(bytearray(length))
+    pos = len(head)
+    view[:pos] = head
+    while pos < length:
+        count = stream.readinto(view[pos:])
+        if not count:
+            break
+        pos += count
+    return view[:pos]
+
+
+def stream_to_file(filepath, head, stream, sync=False):
+    """
+    Write `head` followed by the rest of `stream` to `filepath`.
+
+    Returns the number of bytes written. With `sync`, the data is flushed to disk
+    before returning. A partially written file is removed if copying fails.
+    """
+    f = open(filepath, "xb", opener=open_private)
+    try:
+        with f:
+            f.write(head)
+            shutil.copyfileobj(stream, f, STREAM_CHUNK_SIZE)
+            size = f.tell()
+            if sync:
+                f.flush()
+                _datasync(f.fileno())
+    except BaseException:
+        os.unlink(filepath)
+        raise
+    return size
 
-    content_type = request.content_type or "application/octet-stream"
-    is_json_content = False
-    is_form_data = False
-    data = None
-    raw_data = None
 
-    # Try to parse as JSON if content type suggests it
-    if request.is_json:
+def json_response(payload, status):
+    """Serialize payload with orjson and wrap it in a JSON response."""
+    return raw_json_response(orjson.dumps(payload), status)
+
+
+def raw_json_response(body, status):
+    """Wrap already-serialized JSON bytes in a response."""
+    return Response(body, status=status, mimetype="application/json")
+
+
+class BatchLog:
+    """
+    Append-only NDJSON log owned by a single worker process.
+
+    Log files are created under `prefix` (a directory path as bytes, ending in a
+    separator). Records are appended through one long-lived file descriptor. A background
+    thread syncs the log every `fsync_interval` seconds, and the log is rolled
+    over to a new file once it grows past `roll_size` bytes.
+
+    Syncs run outside the append lock on a duplicate of the file descriptor, so
+    appends carry on while the disk flush is in progress.
+    """
+
+    def __init__(self, prefix, roll_size, fsync_interval):
+        self.prefix = prefix
+        self.roll_size = roll_size
+        self.fsync_interval = fsync_interval
+        self.lock = threading.Lock()
+        self.fd = None
+        self.filename = None
+        self.bytes_written = 0
+        self.dirty = False
+        self.closed = threading.Event()
+        self._open()
+        threading.Thread(target=self._sync_loop, name="batch-log-sync", daemon=True).start()
+
+    def _open(self):
+        self.filename = generate_filename(b"ndjson")
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC
+        self.fd = os.open(self.prefix + self.filename, flags, 0o640)
+        self.bytes_written = 0
+
+    def _sync_loop(self):
+        while not self.closed.wait(self.fsync_interval):
+            try:
+                self.sync()
+            except OSError:
+                app.logger.exception("Failed to sync batch log %s", os.fsdecode(self.filename))
+
+    def append(self, record, sync=False):
+        """
+        Append one record and return the name of the log file it went to.
+
+        `record` is a single line of JSON; the newline is added here. With `sync`,
+        the log is flushed to disk before returning.
+        """
+        old_fd = sync_fd = None
+        with self.lock:
+            if self.bytes_written >= self.roll_size:
+                old_fd, old_filename = self.fd, self.filename
+                self._open()
+            write_line(self.fd, record)
+            self.bytes_written += len(record) + 1
+            self.dirty = True
+            filename = self.filename
+            if sync:
+                sync_fd = os.dup(self.fd)
+        # The rolled-over file is finished, so flush and close it here rather than under the lock
+        if old_fd is not None:
+            try:
+                self._sync_and_close(old_fd)
+            except OSError:
+                # This record went to the new file, so don't fail the request over it
+                app.logger.exception("Failed to sync batch log %s", os.fsdecode(old_filename))
+        if sync_fd is not None:
+            self._sync_and_close(sync_fd)
+        return filename
+
+    def sync(self):
+        """Flush appended records to disk, if there are any."""
+        with self.lock:
+            if not self.dirty or self.fd is None:
+                return
+            fd = os.dup(self.fd)
+            self.dirty = False
         try:
-            data = request.get_json(force=False)
-            is_json_content = True
-        except Exception:
-            pass
-
-    # If not JSON, check for form data (application/x-www-form-urlencoded or multipart/form-data)
-    if not is_json_content and request.form:
-        data = {
-            "_type": "form_data",
-            "_method": request.method,
-            "_content_type": content_type,
-            "fields": dict(request.form)
-        }
-        # Include file metadata if present (not file contents for security)
-        if request.files:
-            data["files"] = {
-                name: {
-                    "filename": f.filename,
-                    "content_type": f.content_type,
-                    "size": f.content_length
-                }
-                for name, f in request.files.items()
-            }
-        is_form_data = True
-        is_json_content = True  # We'll save it as JSON
+            self._sync_and_close(fd)
+        except OSError:
+            with self.lock:
+                self.dirty = True
+            raise
 
-    # Check for query parameters (useful for GET requests)
-    if not is_json_content and not is_form_data and request.args:
-        data = {
-            "_type": "query_params",
-            "_method": request.method,
-            "_content_type": content_type,
-            "params": dict(request.args)
-        }
-        is_json_content = True
+    def close(self):
+        """Flush and close the log. Safe to call more than once."""
+        self.closed.set()
+        with self.lock:
+            fd, self.fd = self.fd, None
+        if fd is not None:
+            self._sync_and_close(fd)
+
+    @staticmethod
+    def _sync_and_close(fd):
+        try:
+            _datasync(fd)
+        finally:
+            os.close(fd)
+
+
+def get_batch_log():
+    """Return this process's batch log, opening it on first use."""
+    global _batch_log
+    with _batch_log_lock:
+        if _batch_log is None:
+            _batch_log = BatchLog(_DATA_PREFIX, LOG_ROLL_SIZE, LOG_FSYNC_INTERVAL)
+        return _batch_log
+
+
+def close_batch_log():
+    """Flush and close this process's batch log, if it has one."""
+    if _batch_log is not None:
+        _batch_log.close()
 
-    # If still nothing, try to parse raw body as JSON
-    if not is_json_content and request.data:
+
+class BackgroundWriter:
+    """
+    Thread pool that writes files after the response has gone out.
+
+    At most `max_pending` writes can be queued; beyond that, submit() blocks
+    until one finishes, so a slow disk can't grow memory without bound.
+    """
+
+    def __init__(self, threads, max_pending):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="file-writer")
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, filepath, payload):
+        """Queue `payload` to be written to `filepath`."""
+        self.slots.acquire()
         try:
-            data = json.loads(request.data)
-            is_json_content = True
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            # Not JSON, treat as raw data
-            raw_data = request.data
-
-    # If we still have nothing, grab raw data
-    if not is_json_content and not raw_data:
-        raw_data = request.data
-
-    # Determine what to save
-    if is_json_content and data is not None:
-        # Save as pretty-printed JSON
-        filename = generate_filename("json")
-        filepath = DATA_DIR / filename
+            self.executor.submit(self._write, filepath, payload)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def _write(self, filepath, payload):
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            os.chmod(filepath, 0o640)
-        except OSError as e:
-            return jsonify({"error": f"Failed to write file: {str(e)}"}), 500
-    elif raw_data:
-        # Save raw data
-        filename = generate_filename("dat")
-        filepath = DATA_DIR / filename
+            write_file(filepath, payload)
+        except OSError:
+            app.logger.exception("Failed to write file %s", os.fsdecode(filepath))
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        """Finish all queued writes and stop the threads."""
+        self.executor.shutdown(wait=True)
+
+
+def get_writer():
+    """Return this process's background writer, creating it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BackgroundWriter(WRITER_THREADS, MAX_PENDING_WRITES)
+        return _writer
+
+
+def shutdown_writer():
+    """Finish this process's queued background writes, if it has any."""
+    if _writer is not None:
+        _writer.shutdown()
+
+
+class Stager:
+    """
+    Stages files in a fast directory and moves them to the data directory in batches.
+
+    Files are written to `staging_prefix` with the request and moved to
+    `data_prefix` by a background thread every `interval` seconds. At most
+    `max_bytes` of this process's files can be staged at once.
+    """
+
+    def __init__(self, staging_prefix, data_prefix, interval, max_bytes):
+        self.staging_prefix = staging_prefix
+        self.data_prefix = data_prefix
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Held for a whole flush, so close() waits for one already in progress
+        self.flush_lock = threading.Lock()
+        self.pending = []
+        self.staged_bytes = 0
+        self.closed = threading.Event()
+        threading.Thread(target=self._move_loop, name="stager", daemon=True).start()
+
+    def _move_loop(self):
+        while not self.closed.wait(self.interval):
+            self.flush()
+
+    def stage(self, filename, payload):
+        """Write `payload` to the staging directory. Returns False if staging is full."""
+        size = len(payload)
+        with self.lock:
+            if self.staged_bytes + size > self.max_bytes:
+                return False
+            self.staged_bytes += size
         try:
-            with open(filepath, "wb") as f:
-                f.write(raw_data)
-            os.chmod(filepath, 0o640)
-        except OSError as e:
-            return jsonify({"error": f"Failed to write file: {str(e)}"}), 500
+            write_file(self.staging_prefix + filename, payload)
+        except BaseException:
+            with self.lock:
+                self.staged_bytes -= size
+            raise
+        with self.lock:
+            self.pending.append((filename, size))
+        return True
+
+    def flush(self):
+        """
+        Move every staged file to the data directory, keeping failed ones for a retry.
+
+        Files that have disappeared from the staging directory are dropped.
+        """
+        with self.flush_lock:
+            with self.lock:
+                pending, self.pending = self.pending, []
+            failed = []
+            released_bytes = 0
+            for filename, size in pending:
+                src = self.staging_prefix + filename
+                try:
+                    move_file(src, self.data_prefix + filename)
+                except OSError as e:
+                    if e.errno == errno.ENOENT and not os.path.lexists(src):
+                        app.logger.warning("Staged file %s has disappeared", os.fsdecode(filename))
+                        released_bytes += size
+                    else:
+                        app.logger.exception("Failed to move staged file %s", os.fsdecode(filename))
+                        failed.append((filename, size))
+                else:
+                    released_bytes += size
+            with self.lock:
+                self.pending.extend(failed)
+                self.staged_bytes -= released_bytes
+
+    def close(self):
+        """Stop the background thread and move everything still staged, waiting for any move in progress."""
+        self.closed.set()
+        self.flush()
+
+
+def get_stager():
+    """Return this process's stager, creating it on first use."""
+    global _stager
+    with _stager_lock:
+        if _stager is None:
+            _stager = Stager(_STAGING_PREFIX, _DATA_PREFIX, STAGING_INTERVAL, STAGING_MAX_BYTES)
+        return _stager
+
+
+def close_stager():
+    """Move this process's staged files to the data directory, if it has any."""
+    if _stager is not None:
+        _stager.close()
+
+
+def recover_staged_files():
+    """Move files left in the staging directory (e.g. by a crashed worker) to the data directory."""
+    if not STAGING_DIR:
+        return
+    with os.scandir(_STAGING_PREFIX) as entries:
+        for entry in entries:
+            if entry.is_file():
+                move_file(entry.path, _DATA_PREFIX + entry.name)
+
+
+# Query parameters that control how /dump stores a payload, rather than being part of it
+_CONTROL_PARAMS = frozenset(["pretty", "sync"])
+
+
+def query_flag(req, name):
+    """Return whether the query parameter `name` is set to a true value."""
+    return req.args.get(name, "").lower() in ("1", "true", "yes")
+
+
+def store_file(req, filename, payload):
+    """
+    Write `payload` to `filename` in the staging directory if enabled, otherwise
+    in the background straight to the data directory.
+
+    With ``?sync=1`` the write goes to the data directory inline and is flushed to
+    disk, so that failures are reported to the client instead of only being logged.
+
+    Payloads too large to ever fit in the staging directory bypass it.
+
+    Returns False if the payload couldn't be staged because staging is full.
+    """
+    if query_flag(req, "sync"):
+        write_file(_DATA_PREFIX + filename, payload, sync=True)
+    elif STAGING_DIR and len(payload) <= STAGING_MAX_BYTES:
+        return get_stager().stage(filename, payload)
     else:
-        return jsonify({"error": "Empty payload"}), 400
+        get_writer().submit(_DATA_PREFIX + filename, payload)
+    return True
+
+
+def save_file(req, filename, payload, parsed_as_json, was_form_data):
+    """Store an in-memory payload as its own file and build the response."""
+    try:
+        stored = store_file(req, filename, payload)
+    except OSError as e:
+        return write_failed_response(e)
+    if not stored:
+        return raw_json_response(_STAGING_FULL, 503)
+    return success_response(req, filename, len(payload), parsed_as_json, was_form_data)
+
+
+def success_response(req, filename, size, parsed_as_json, was_form_data):
+    """Build the 201 response describing a saved payload."""
+    return raw_json_response(_SUCCESS_TEMPLATE % (
+        filename,
+        size,
+        orjson.dumps(req.content_type or "application/octet-stream"),
+        req.method.encode(),
+        _JSON_BOOL[parsed_as_json],
+        _JSON_BOOL[was_form_data],
+    ), 201)
+
+
+def write_failed_response(error):
+    """Build the 500 response for a payload that couldn't be written."""
+    return json_response({"error": f"Failed to write file: {str(error)}"}, 500)
 
-    return jsonify({
-        "success": True,
-        "filename": filename,
-        "size": filepath.stat().st_size,
-        "content_type": content_type,
-        "method": request.method,
-        "parsed_as_json": is_json_content,
-        "was_form_data": is_form_data
-    }), 201
+
+def json_payload(req, body):
+    """
+    Validate a JSON request body and return the bytes to store for it.
+
+    The body is checked with simdjson without building Python objects and is
+    normally stored verbatim. It's re-serialized only when it must be: minified
+    onto one line for the batch log, or pretty-printed for ``?pretty=1``.
+    Raises ValueError if `body` isn't a single JSON document.
+    """
+    parser = get_json_parser()
+    try:
+        if BATCH_LOG:
+            doc = parser.parse(body)
+            return doc.mini if isinstance(doc, (simdjson.Object, simdjson.Array)) else orjson.dumps(doc)
+        if query_flag(req, "pretty"):
+            # recursive=True returns plain Python objects, so no proxies keep the parser busy
+            return orjson.dumps(parser.parse(body, True), option=orjson.OPT_INDENT_2)
+        parser.parse(body)
+        return body
+    except ValueError as e:
+        # Numbers out of simdjson's range (e.g. 1e400) are still valid JSON
+        if not str(e).startswith("NUMBER_ERROR"):
+            raise
+        return stdlib_json_payload(req, body)
+    except (RuntimeError, orjson.JSONEncodeError):
+        # simdjson can't represent some valid JSON, such as integers beyond 64 bits, and
+        # orjson won't serialize documents nested more than 254 levels deep
+        return stdlib_json_payload(req, body)
+
+
+def _reject_constant(name):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def stdlib_json_payload(req, body):
+    """
+    Slow path of json_payload() using the stdlib json module, which handles
+    arbitrarily large numbers and deeper nesting. Raises ValueError if `body`
+    isn't JSON, or if it has to be re-serialized and can't be as valid JSON
+    (e.g. numbers that overflow to infinity).
+    """
+    try:
+        data = json.loads(bytes(body), parse_constant=_reject_constant)
+        if BATCH_LOG:
+            return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+        if query_flag(req, "pretty"):
+            return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=2).encode()
+    except RecursionError as e:
+        raise ValueError("JSON document is nested too deeply") from e
+    return body
+
+
+def save_json(req, data, is_form_data=False):
+    """Serialize and save a JSON-serializable payload (form data or query parameters)."""
+    # Compact JSON unless the client asked for it pretty-printed (never in the batch log)
+    pretty = not BATCH_LOG and query_flag(req, "pretty")
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None)
+    return save_serialized_json(req, payload, is_form_data)
+
+
+def save_serialized_json(req, payload, is_form_data=False):
+    """
+    Save serialized JSON, to its own file or to the batch log.
+
+    In batch log mode `payload` must be on a single line.
+    """
+    if BATCH_LOG:
+        # Append as a single NDJSON line to this worker's batch log
+        try:
+            filename = get_batch_log().append(payload, sync=query_flag(req, "sync"))
+        except OSError as e:
+            return write_failed_response(e)
+        return success_response(req, filename, len(payload) + 1, True, is_form_data)
+
+    return save_file(req, generate_filename(b"json"), payload, True, is_form_data)
+
+
+def save_raw(req, raw_data):
+    """Save an in-memory non-JSON payload as raw data."""
+    return save_file(req, generate_filename(b"dat"), raw_data, False, False)
+
+
+def save_stream(req, head):
+    """
+    Stream a non-JSON payload to disk without buffering the whole body.
+
+    Streamed payloads always go straight to the data directory, as their size
+    isn't known up front.
+    """
+    filename = generate_filename(b"dat")
+    try:
+        size = stream_to_file(_DATA_PREFIX + filename, head, req.stream, query_flag(req, "sync"))
+    except OSError as e:
+        return write_failed_response(e)
+    return success_response(req, filename, size, False, False)
+
+
+def handle_json(req):
+    """Handle application/json bodies, falling back to raw handling if they don't parse."""
+    body = read_body(req)
+    try:
+        payload = json_payload(req, body)
+    except ValueError:
+        # Not JSON after all; empty bodies can still fall back to query parameters
+        return save_raw(req, body) if body else handle_raw(req, body)
+    return save_serialized_json(req, payload)
+
+
+def handle_form(req):
+    """Handle url-encoded and multipart form submissions."""
+    if not req.form:
+        return handle_raw(req)
+    data = {
+        "_type": "form_data",
+        "_method": req.method,
+        "_content_type": req.content_type,
+        "fields": dict(req.form)
+    }
+    # Include file metadata if present (not file contents for security)
+    if req.files:
+        data["files"] = {
+            name: {
+                "filename": f.filename,
+                "content_type": f.content_type,
+                "size": f.content_length
+            }
+            for name, f in req.files.items()
+        }
+    return save_json(req, data, is_form_data=True)
+
+
+def handle_raw(req, body=None):
+    """
+    Handle any other body: save it as JSON if it parses, otherwise as raw data.
+
+    Requests without a body (typically GETs) have their query parameters saved instead.
+    """
+    # If the body hasn't been read yet, peek at its first chunk. Bodies that can't be
+    # JSON are streamed straight to disk instead of being read into memory.
+    if body is None:
+        head = req.stream.read(STREAM_CHUNK_SIZE)
+        if head and not _JSON_START.match(head):
+            return save_stream(req, head)
+        body = read_body(req, head)
+
+    if body:
+        try:
+            payload = json_payload(req, body)
+        except ValueError:
+            return save_raw(req, body)
+        return save_serialized_json(req, payload)
+
+    params = {name: value for name, value in req.args.items() if name not in _CONTROL_PARAMS}
+    if params:
+        return save_json(req, {
+            "_type": "query_params",
+            "_method": req.method,
+            "_content_type": req.content_type or "application/octet-stream",
+            "params": params
+        })
+
+    return raw_json_response(_EMPTY_PAYLOAD, 400)
+
+
+# HTTP methods accepted by /dump
+DUMP_METHODS = frozenset(["GET", "POST", "PUT", "PATCH", "DELETE"])
+
+# Payload handlers by mimetype; everything else goes to handle_raw
+_HANDLERS = {
+    "application/json": handle_json,
+    "application/x-www-form-urlencoded": handle_form,
+    "multipart/form-data": handle_form,
+}
+
+
+def dump_payload(req):
+    """Save the payload of a /dump request using the handler for its mimetype."""
+    handler = _HANDLERS.get(req.mimetype, handle_raw)
+    return handler(req)
+
+
+@app.route("/dump", methods=list(DUMP_METHODS))
+def dump_json():
+    """
+    Receive a payload and write it to a file.
+
+    Accepts any content type and HTTP method. The request's mimetype picks exactly
+    one handler: JSON payloads are saved compactly (pretty-printed with
+    ``?pretty=1``), form data is converted to JSON, other content types are saved
+    as JSON if they parse and as raw data otherwise.
+
+    Returns the filename of the created file.
+    """
+    return dump_payload(request)
 
 
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint for monitoring."""
-    return jsonify({"status": "healthy"}), 200
+    return raw_json_response(_HEALTHY, 200)
 
 
 @app.errorhandler(413)
 def request_entity_too_large(error):
     """Handle payload too large errors."""
-    return jsonify({
-        "error": f"Payload too large. Maximum size is {MAX_CONTENT_LENGTH} bytes"
-    }), 413
+    return raw_json_response(_PAYLOAD_TOO_LARGE, 413)
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle internal server errors."""
-    return jsonify({"error": "Internal server error"}), 500
+    return raw_json_response(_INTERNAL_ERROR, 500)
+
+
+class DumpRequest(Request):
+    """Plain Werkzeug request used by the WSGI fast path, with the app's size limit."""
+
+    max_content_length = MAX_CONTENT_LENGTH
+
+
+def dump_wsgi(environ, start_response):
+    """Serve /dump from a plain Werkzeug request, skipping Flask's request handling."""
+    req = DumpRequest(environ)
+    try:
+        response = dump_payload(req)
+    except HTTPException as e:
+        if e.code == 413:
+            response = raw_json_response(_PAYLOAD_TOO_LARGE, 413)
+        else:
+            response = e.get_response(environ)
+    except Exception:
+        app.logger.exception("Exception on %s [%s]", req.path, req.method)
+        response = raw_json_response(_INTERNAL_ERROR, 500)
+    return response(environ, start_response)
+
+
+def health_wsgi(environ, start_response):
+    """Serve /health without going through Flask."""
+    # Servers may extend the header list in place, so hand each request a copy
+    start_response("200 OK", list(_HEALTHY_HEADERS))
+    return [_HEALTHY]
+
+
+# Fast-path routes as path -> (allowed methods, WSGI callable)
+_ROUTES = {
+    "/dump": (DUMP_METHODS, dump_wsgi),
+    "/health": (frozenset(["GET"]), health_wsgi),
+}
+
+
+def application(environ, start_response):
+    """
+    WSGI entry point for production.
+
+    /dump and /health are dispatched straight from PATH_INFO. Everything else,
+    including 404s and 405s, is handed to the Flask app.
+    """
+    route = _ROUTES.get(environ.get("PATH_INFO"))
+    if route is None or environ["REQUEST_METHOD"] not in route[0]:
+        return app.wsgi_app(environ, start_response)
+    return route[1](environ, start_response)
 
 
 if __name__ == "__main__":
@@ -6,11 +6,13 @@ import multiprocessing
 bind = "127.0.0.1:8000"
 
 # Worker configuration
-# Rule of thumb: 2-4 workers per core
-workers = multiprocessing.cpu_count() * 2 + 1
+# One process per core; threads provide the concurrency, so blocking file
+# writes in one request don't hold up the others in the same worker
+workers = multiprocessing.cpu_count()
 
-# Worker class - sync is fine for I/O-bound file writes
-worker_class = "sync"
+# Worker class - threaded workers overlap I/O-bound file writes
+worker_class = "gthread"
+threads = 32
 
 # Timeout for worker processes (seconds)
 timeout = 30
@@ -18,7 +20,8 @@ timeout = 30
 # Graceful timeout for worker restart
 graceful_timeout = 10
 
-# Maximum requests per worker before restart (prevents memory leaks)
+# Maximum requests per worker before restart (prevents memory leaks).
+# gthread workers finish in-flight requests before restarting.
 max_requests = 1000
 max_requests_jitter = 50
 
@@ -35,3 +38,28 @@ forwarded_allow_ips = "127.0.0.1"
 
 # Preload app for faster worker spawning (uses more memory but faster restarts)
 preload_app = True
+
+# Server hooks
+def when_ready(server):
+    """Create the data directory once at startup and recover any leftover staged files."""
+    import app
+    app.ensure_data_dir()
+    app.recover_staged_files()
+
+
+def post_fork(server, worker):
+    """Make sure the data directory exists and start the worker's batch log or stager up front."""
+    import app
+    app.ensure_data_dir()
+    if app.BATCH_LOG:
+        app.get_batch_log()
+    if app.STAGING_DIR:
+        app.get_stager()
+
+
+def worker_exit(server, worker):
+    """Finish pending writes, move staged files and close the batch log before the worker exits."""
+    import app
+    app.shutdown_writer()
+    app.close_stager()
+    app.close_batch_log()
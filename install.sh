@@ -369,7 +369,7 @@ Environment="JSON_DUMP_DIR=${DATA_DIR}"
 Environment="JSON_DUMP_MAX_SIZE=${MAX_PAYLOAD_SIZE}"
 
 # Start command
-ExecStart=${APP_DIR}/venv/bin/gunicorn -c gunicorn.conf.py app:app
+ExecStart=${APP_DIR}/venv/bin/gunicorn -c gunicorn.conf.py app:application
 
 # Reload command (graceful restart)
 ExecReload=/bin/kill -s HUP \$MAINPID
@@ -0,0 +1,171 @@
+"""Tests for the JSON Dump app."""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# app reads its configuration at import time
+os.environ.setdefault("JSON_DUMP_DIR", tempfile.mkdtemp(prefix="json_dump_test_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson  # noqa: E402
+import pytest  # noqa: E402
+from werkzeug.test import Client  # noqa: E402
+
+import app  # noqa: E402
+
+BIG_INT_BODY = b'{"id": 123456789012345678901234567890}'
+
+
+@pytest.fixture
+def client():
+    return Client(app.application)
+
+
+@pytest.fixture
+def batch_log(monkeypatch):
+    monkeypatch.setattr(app, "BATCH_LOG", True)
+    monkeypatch.setattr(app, "_batch_log", None)
+    yield
+    app.close_batch_log()
+
+
+def saved(response):
+    assert response.status_code == 201, response.data
+    with open(app.DATA_DIR / response.json["filename"], "rb") as f:
+        return response.json, f.read()
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "text/plain"])
+def test_big_int_stored_verbatim(client, content_type):
+    info, contents = saved(client.post("/dump?sync=1", data=BIG_INT_BODY, content_type=content_type))
+    assert info["parsed_as_json"] is True
+    assert info["filename"].endswith(".json")
+    assert contents == BIG_INT_BODY
+
+
+def test_big_int_pretty(client):
+    _, contents = saved(client.post("/dump?sync=1&pretty=1", data=BIG_INT_BODY, content_type="application/json"))
+    assert contents == b'{\n  "id": 123456789012345678901234567890\n}'
+
+
+def test_big_int_batch_log(client, batch_log):
+    info, contents = saved(client.post("/dump?sync=1", data=BIG_INT_BODY, content_type="application/json"))
+    assert info["filename"].endswith(".ndjson")
+    assert contents == b'{"id":123456789012345678901234567890}\n'
+
+
+def test_too_deep_stored_raw(client):
+    body = b"[" * 5000 + b"]" * 5000
+    info, contents = saved(client.post("/dump?sync=1", data=body, content_type="application/json"))
+    assert info["parsed_as_json"] is False
+    assert contents == body
+
+
+def test_deep_pretty(client):
+    body = b"[" * 300 + b"]" * 300
+    info, contents = saved(client.post("/dump?sync=1&pretty=1", data=body, content_type="application/json"))
+    assert info["parsed_as_json"] is True
+    assert contents.replace(b" ", b"").replace(b"\n", b"") == body
+
+
+def test_out_of_range_number_stored_verbatim(client):
+    info, contents = saved(client.post("/dump?sync=1", data=b"[1e400]", content_type="application/json"))
+    assert info["parsed_as_json"] is True
+    assert info["filename"].endswith(".json")
+    assert contents == b"[1e400]"
+
+
+def test_out_of_range_number_pretty_stored_raw(client):
+    info, contents = saved(client.post("/dump?sync=1&pretty=1", data=b"[1e400]", content_type="application/json"))
+    assert info["parsed_as_json"] is False
+    assert contents == b"[1e400]"
+
+
+@pytest.mark.parametrize("query", ["sync=1", "pretty=1", "sync=1&pretty=1"])
+def test_control_params_alone_are_empty(client, query):
+    assert client.get("/dump?" + query).status_code == 400
+    assert client.post("/dump?" + query).status_code == 400
+
+
+def test_control_params_not_saved(client):
+    _, contents = saved(client.get("/dump?sync=1&device=probe"))
+    assert orjson.loads(contents)["params"] == {"device": "probe"}
+
+
+@pytest.fixture
+def stager(tmp_path, monkeypatch):
+    staging = tmp_path / "staging"
+    staging.mkdir()
+    monkeypatch.setattr(app, "STAGING_DIR", str(staging))
+    monkeypatch.setattr(app, "STAGING_MAX_BYTES", 32)
+    stager = app.Stager(os.fsencode(os.path.join(staging, "")), app._DATA_PREFIX, 3600, 32)
+    monkeypatch.setattr(app, "_stager", stager)
+    yield stager
+    stager.close()
+
+
+def test_vanished_staged_file_dropped(stager):
+    assert stager.stage(b"gone.json", b"x" * 20)
+    os.unlink(stager.staging_prefix + b"gone.json")
+    stager.flush()
+    assert stager.pending == []
+    assert stager.staged_bytes == 0
+    assert stager.stage(b"next.json", b"x" * 32)
+
+
+def test_staging_full_returns_503(client, stager):
+    body = b'{"k":"xxxxxxxxxxxx"}'
+    assert client.post("/dump", data=body, content_type="application/json").status_code == 201
+    assert client.post("/dump", data=body, content_type="application/json").status_code == 503
+    stager.flush()
+    assert client.post("/dump", data=body, content_type="application/json").status_code == 201
+
+
+def test_oversized_payload_bypasses_staging(client, stager, monkeypatch):
+    monkeypatch.setattr(app, "_writer", None)
+    body = b'{"k":"' + b"x" * 40 + b'"}'
+    response = client.post("/dump", data=body, content_type="application/json")
+    app.shutdown_writer()
+    _, contents = saved(response)
+    assert contents == body
+    assert stager.staged_bytes == 0
+    assert os.listdir(app.STAGING_DIR) == []
+
+
+def read_log_lines(directory):
+    lines = []
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), "rb") as f:
+            contents = f.read()
+        assert contents.endswith(b"\n")
+        lines.extend(contents.splitlines())
+    return lines
+
+
+def test_batch_log_rollover(tmp_path):
+    log = app.BatchLog(os.fsencode(os.path.join(tmp_path, "")), 256, 3600)
+    records = [orjson.dumps({"n": i}) for i in range(2000)]
+    with ThreadPoolExecutor(16) as pool:
+        filenames = set(pool.map(log.append, records))
+    log.close()
+    assert len(filenames) > 1
+    assert set(os.listdir(tmp_path)) == {os.fsdecode(f) for f in filenames}
+    lines = read_log_lines(tmp_path)
+    assert sorted(lines) == sorted(records)
+    assert all(orjson.loads(line) for line in lines)
+
+
+def test_batch_log_append_sync(tmp_path, monkeypatch):
+    synced = []
+    datasync = app._datasync
+    monkeypatch.setattr(app, "_datasync", lambda fd: synced.append(os.fstat(fd).st_size) or datasync(fd))
+    log = app.BatchLog(os.fsencode(os.path.join(tmp_path, "")), 1 << 20, 3600)
+    log.append(b'{"a":1}')
+    filename = log.append(b'{"b":2}', sync=True)
+    # Synced before returning, with both records already written
+    assert synced == [16]
+    log.close()
+    with open(os.path.join(tmp_path, os.fsdecode(filename)), "rb") as f:
+        assert f.read() == b'{"a":1}\n{"b":2}\n'